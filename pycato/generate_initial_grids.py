@@ -7,7 +7,7 @@ import os
 import h5py
 from configparser import ConfigParser
 
-from .unit_registry import ureg
+from .unit_registry import ureg, magnitude_as
 
 
 def get_n_ghost_layers_required(input):
@@ -40,6 +40,13 @@ def get_n_ghost_layers_required(input):
     return n_ghost_layers
 
 
+def _allocate_fields(cell_shape, fill_value):
+    """Allocate the cell-centered rho, u, v, and p arrays as views into a single
+    buffer. Each field is Fortran-ordered, so it can be written without a copy"""
+    fields = np.full((*cell_shape, 4), fill_value, dtype=np.float64, order="F")
+    return fields[..., 0], fields[..., 1], fields[..., 2], fields[..., 3]
+
+
 def make_uniform_grid(n_cells, xrange, yrange, input_file="input.ini"):
     """Generate a uniform grid. This will output a dictionary
     that contains the appropriate arrays, which include the ghost
@@ -81,33 +88,29 @@ def make_uniform_grid(n_cells, xrange, yrange, input_file="input.ini"):
         dtype=np.float64,
     )
 
-    xc = np.zeros(x.shape[0] - 1, dtype=np.float64)
-    yc = np.zeros(y.shape[0] - 1, dtype=np.float64)
-
-    # 2d versions
-    y_2d, x_2d = np.meshgrid(y, x)  # nodes
+    # 2d versions of the nodes. The grid is rectilinear, so these are read-only
+    # broadcast views of the 1d node locations rather than full meshgrid copies
+    node_shape = (x.shape[0], y.shape[0])
+    x_2d = np.broadcast_to(x[:, np.newaxis], node_shape)
+    y_2d = np.broadcast_to(y[np.newaxis, :], node_shape)
 
     # cell-centered arrays
-    # node_shape = (x_2d.shape[0], x_2d.shape[1])
-    cell_shape = (x_2d.shape[0] - 1, x_2d.shape[1] - 1)
-    rho = np.ones(cell_shape)
-    u = np.ones(cell_shape)
-    v = np.ones(cell_shape)
-    p = np.ones(cell_shape)
+    cell_shape = (x.shape[0] - 1, y.shape[0] - 1)
+    rho, u, v, p = _allocate_fields(cell_shape, fill_value=1.0)
 
     # cell center locations
-    xc = x_2d[:-1, :-1] + dx / 2.0
-    yc = y_2d[:-1, :-1] + dy / 2.0
+    xc = np.broadcast_to((x[:-1] + dx / 2.0)[:, np.newaxis], cell_shape)
+    yc = np.broadcast_to((y[:-1] + dy / 2.0)[np.newaxis, :], cell_shape)
 
     return {
-        "x": x_2d * ureg("cm"),
-        "y": y_2d * ureg("cm"),
-        "rho": rho * ureg("g/cc"),
-        "u": u * ureg("cm/s"),
-        "v": v * ureg("cm/s"),
-        "p": p * ureg("barye"),
-        "xc": xc * ureg("cm"),
-        "yc": yc * ureg("cm"),
+        "x": ureg.Quantity(x_2d, "cm"),
+        "y": ureg.Quantity(y_2d, "cm"),
+        "rho": ureg.Quantity(rho, "g/cc"),
+        "u": ureg.Quantity(u, "cm/s"),
+        "v": ureg.Quantity(v, "cm/s"),
+        "p": ureg.Quantity(p, "barye"),
+        "xc": ureg.Quantity(xc, "cm"),
+        "yc": ureg.Quantity(yc, "cm"),
         "n_ghost_layers": n_ghost_layers,
     }
 
@@ -137,18 +140,32 @@ def linear_spacing(start, initial_dx, scale, max_dist):
         [description]
     """
 
-    dx = initial_dx
-    x = [start]
-
     if start >= max_dist:
         raise Exception("Error: start >= max_dist")
-    while True:
-        new_x = x[-1] + dx
-        x.append(new_x)
-        dx = dx * scale
-        if x[-1] > max_dist:
-            break
-    x = np.array(x, dtype=np.float64)
+
+    # The spacing grows as initial_dx * scale**k, so the node locations are the
+    # partial sums of a geometric series. Estimate the index of the first node
+    # past max_dist, evaluate the series in one shot, and keep everything up to
+    # and including that node.
+    distance = max_dist - start
+    if scale == 1.0:
+        n = int(np.floor(distance / initial_dx)) + 1
+        k = np.arange(n + 2, dtype=np.float64)
+        x = start + initial_dx * k
+    else:
+        # With a shrinking spacing the series converges to initial_dx / (1 - scale)
+        if distance * (scale - 1.0) / initial_dx <= -1.0:
+            raise Exception(
+                f"Error: max_dist is unreachable with scale = {scale}, the nodes "
+                f"never get past start + initial_dx / (1 - scale) = "
+                f"{start + initial_dx / (1.0 - scale)}"
+            )
+        n_float = np.log1p(distance * (scale - 1.0) / initial_dx) / np.log(scale)
+        n = int(np.floor(n_float))
+        k = np.arange(n + 3, dtype=np.float64)
+        x = start + initial_dx * (np.power(scale, k) - 1.0) / (scale - 1.0)
+
+    x = x[: np.searchsorted(x, max_dist, side="right") + 1]
     dx_last = x[-1] - x[-2]
     dx_first = x[1] - x[0]
     ncells = len(x)
@@ -163,6 +180,51 @@ def constant_spacing(start, max_dist, ncells):
     return x, dx, end
 
 
+def _add_ghost_nodes(x, n_ghost_layers):
+    """Pad a 1D array of node locations with ghost nodes on either side. The
+    ghost cells have the same width as the first/last real cell"""
+    ldx = x[1] - x[0]
+    rdx = x[-1] - x[-2]
+    left = x[0] - ldx * np.arange(n_ghost_layers, 0, -1)
+    right = x[-1] + rdx * np.arange(1, n_ghost_layers + 1)
+    return np.concatenate([left, x, right])
+
+
+def _layer_nodes(layer_thicknesses, layer_n_cells, layer_spacing, scale_factor):
+    """Build the 1D node locations (no ghost nodes) of a stack of layers in x.
+
+    The layer bounds all come from a single cumulative sum of the thicknesses.
+    A 'linear' layer starts with the spacing of the last 'constant' layer
+    before it, so the layers are still built in order.
+    """
+    layer_stops = np.cumsum(layer_thicknesses)
+    layer_starts = np.concatenate(([0.0], layer_stops[:-1]))
+
+    dx_last = 0
+    total_x = []
+    for layer_id, (start_x, stop_x, ncells, spacing) in enumerate(
+        zip(layer_starts, layer_stops, layer_n_cells, layer_spacing)
+    ):
+        if spacing == "linear":
+            if layer_id == 0:
+                raise Exception("Linear spacing not set up for the first layer yet...")
+            x, _, _, _ = linear_spacing(
+                start=start_x,
+                initial_dx=dx_last,
+                scale=scale_factor,
+                max_dist=stop_x,
+            )
+        else:  # spacing == 'constant':
+            x, dx_last, _ = constant_spacing(
+                start=start_x, max_dist=stop_x, ncells=ncells
+            )
+
+        if np.any(x):
+            total_x.append(x)
+
+    return np.unique(np.concatenate(total_x))
+
+
 def make_2d_layered_grid(
     layer_thicknesses,
     layer_n_cells,
@@ -216,43 +278,10 @@ def make_2d_layered_grid(
 
     n_ghost_layers = get_n_ghost_layers_required(input_file)
     print(f"Building with {n_ghost_layers} ghost layers")
-    layer_thicknesses = layer_thicknesses.to("cm").m
-    cumulative_thickness = 0
-    dx_last = 0
-    total_x = []
-    layer_id = 0
-
-    for layer_thickness, ncells, spacing in zip(
-        layer_thicknesses, layer_n_cells, layer_spacing
-    ):
-        start_x = cumulative_thickness
-        stop_x = start_x + layer_thickness
-        cumulative_thickness = +stop_x
-        if spacing == "linear":
-            if layer_id == 0:
-                raise Exception("Linear spacing not set up for the first layer yet...")
-            x, _, _, actual_cells = linear_spacing(
-                start=start_x,
-                initial_dx=dx_last,
-                scale=spacing_scale_factor,
-                max_dist=cumulative_thickness,
-            )
-        else:  # spacing == 'constant':
-            x, dx_last, end = constant_spacing(
-                start=start_x, max_dist=stop_x, ncells=ncells
-            )
-
-        layer_id = layer_id + 1
-
-        if np.any(x):
-            total_x.append(x)
-
-    x = np.unique(np.concatenate(total_x)) * ureg("cm")
-    x = x.to("cm").m
-
-    # right/left cell size - for making ghost layers
-    ldx = x[1] - x[0]
-    rdx = x[-1] - x[-2]
+    layer_thicknesses = magnitude_as(layer_thicknesses, "cm")
+    x = _layer_nodes(
+        layer_thicknesses, layer_n_cells, layer_spacing, spacing_scale_factor
+    )
 
     # find the minimum cell spacing
     try:
@@ -273,111 +302,54 @@ def make_2d_layered_grid(
         dtype=np.float64,
     )
 
-    # add a ghost cell on either side
-    if n_ghost_layers == 1:
-        x = np.array([x[0] - ldx] + list(x) + [x[-1] + rdx], dtype=np.float64)
-    elif n_ghost_layers == 2:
-        x = np.array(
-            [x[0] - 2 * ldx]
-            + [x[0] - ldx]
-            + list(x)
-            + [x[-1] + rdx]
-            + [x[-1] + 2 * rdx],
-            dtype=np.float64,
-        )
-    elif n_ghost_layers == 3:
-        x = np.array(
-            [x[0] - 3 * ldx]
-            + [x[0] - 2 * ldx]
-            + [x[0] - ldx]
-            + list(x)
-            + [x[-1] + rdx]
-            + [x[-1] + 2 * rdx]
-            + [x[-1] + 3 * rdx],
-            dtype=np.float64,
-        )
-    else:
-        raise Exception("Unable to work with n_ghost_layers that aren't 1 2, or 3")
+    # add the ghost cells on either side
+    x = _add_ghost_nodes(x, n_ghost_layers)
     dx = np.diff(x) / 2.0
     xc = x[:-1] + dx / 2.0
 
-    layer_cell_idx_ranges = []  # [(first cell, last cell), etc]
+    # Label each cell with the layer it belongs to. The cell centers are sorted, so
+    # this is a single binary search against the layer interfaces. The ghost cells
+    # get the label of the adjacent (first or last) layer
     cum_layer_thickness = np.cumsum(layer_thicknesses)
-    for layer_idx, l_thick in enumerate(layer_thicknesses):
-        if layer_idx == 0:  # first layer
-            start_x = x[0]
-            end_x = cum_layer_thickness[layer_idx]
-        elif layer_idx == len(layer_thicknesses) - 1:  # last layer
-            start_x = cum_layer_thickness[layer_idx - 1]
-            end_x = x[-1]
-        else:  # middle layers
-            start_x = cum_layer_thickness[layer_idx - 1]
-            end_x = cum_layer_thickness[layer_idx]
-
-        loc = np.where((xc >= start_x) & (xc < end_x))[0]
-        start_i = loc[0]
-        end_i = loc[-1]
-        layer_cell_idx_ranges.append((start_i, end_i))
-
-    # 2d versions
-    y_2d, x_2d = np.meshgrid(y, x)  # nodes
+    layer_idx = np.searchsorted(cum_layer_thickness[:-1], xc, side="right")
+
+    # 2d versions of the nodes (read-only broadcast views of the 1d node locations)
+    node_shape = (x.shape[0], y.shape[0])
+    x_2d = np.broadcast_to(x[:, np.newaxis], node_shape)
+    y_2d = np.broadcast_to(y[np.newaxis, :], node_shape)
 
     # cell-centered arrays
-    # node_shape = (x_2d.shape[0], x_2d.shape[1])
-    cell_shape = (x_2d.shape[0] - 1, x_2d.shape[1] - 1)
-    rho = np.zeros(cell_shape)
-    u = np.zeros(cell_shape)
-    v = np.zeros(cell_shape)
-    p = np.zeros(cell_shape)
-
-    # Assign rho, u, v, and p to the cell-centered arrays
-    for layer_idx, layer in enumerate(layer_cell_idx_ranges):
-        if layer_idx == len(layer_cell_idx_ranges):
-            s = layer[0]
-            e = layer[1]
-        else:
-            s = layer[0]
-            e = -1
-
-        # Convert to cgs units
-        rho[s:e, :] = layer_density[layer_idx].to("g/cc").m
-        u[s:e, :] = layer_u[layer_idx].to("cm/s").m
-        v[s:e, :] = layer_v[layer_idx].to("cm/s").m
-        p[s:e, :] = layer_pressure[layer_idx].to("barye").m
-
-    # Assign ghost layer values
-    if n_ghost_layers == 1:
-        ghost_layers = [0, -1]
-    elif n_ghost_layers == 2:
-        ghost_layers = [0, 1, -2, -1]
-    elif n_ghost_layers == 3:
-        ghost_layers = [0, 1, 2, -3, -2, -1]
-    else:
-        raise Exception("Unable to work with n_ghost_layers that aren't 1 or 2")
+    cell_shape = (x.shape[0] - 1, y.shape[0] - 1)
+    rho, u, v, p = _allocate_fields(cell_shape, fill_value=0.0)
 
-    for i in [0, -1]:
-        rho[i, :] = layer_density[i].to("g/cc").m
-        u[i, :] = layer_u[i].to("cm/s").m
-        v[i, :] = layer_v[i].to("cm/s").m
-        p[i, :] = layer_pressure[i].to("barye").m
+    # Assign rho, u, v, and p to the cell-centered arrays (converted to cgs units)
+    rho_layers = np.array([magnitude_as(d, "g/cc") for d in layer_density])
+    u_layers = np.array([magnitude_as(d, "cm/s") for d in layer_u])
+    v_layers = np.array([magnitude_as(d, "cm/s") for d in layer_v])
+    p_layers = np.array([magnitude_as(d, "barye") for d in layer_pressure])
+
+    rho[...] = rho_layers[layer_idx, np.newaxis]
+    u[...] = u_layers[layer_idx, np.newaxis]
+    v[...] = v_layers[layer_idx, np.newaxis]
+    p[...] = p_layers[layer_idx, np.newaxis]
 
     # cell spacing
-    dy = (np.diff(y_2d[0, :]) / 2.0)[0]
-    dx = (np.diff(x_2d[:, 0]) / 2.0)[0]
+    dy = (np.diff(y) / 2.0)[0]
+    dx = (np.diff(x) / 2.0)[0]
 
     # cell center locations
-    xc = x_2d[:-1, :-1] + dx
-    yc = y_2d[:-1, :-1] + dy
+    xc = np.broadcast_to((x[:-1] + dx)[:, np.newaxis], cell_shape)
+    yc = np.broadcast_to((y[:-1] + dy)[np.newaxis, :], cell_shape)
 
     return {
-        "x": x_2d * ureg("cm"),
-        "y": y_2d * ureg("cm"),
-        "rho": rho * ureg("g/cc"),
-        "u": u * ureg("cm/s"),
-        "v": v * ureg("cm/s"),
-        "p": p * ureg("barye"),
-        "xc": xc * ureg("cm"),
-        "yc": yc * ureg("cm"),
+        "x": ureg.Quantity(x_2d, "cm"),
+        "y": ureg.Quantity(y_2d, "cm"),
+        "rho": ureg.Quantity(rho, "g/cc"),
+        "u": ureg.Quantity(u, "cm/s"),
+        "v": ureg.Quantity(v, "cm/s"),
+        "p": ureg.Quantity(p, "barye"),
+        "xc": ureg.Quantity(xc, "cm"),
+        "yc": ureg.Quantity(yc, "cm"),
         "n_ghost_layers": n_ghost_layers,
     }
 
@@ -421,119 +393,66 @@ def make_1d_layered_grid(
     if not layer_spacing:
         layer_spacing = ["constant"] * len(layer_thicknesses)
 
-    layer_thicknesses = layer_thicknesses.to("cm").m
-    cumulative_thickness = 0
-    dx_last = 0
-    total_x = []
-    layer_id = 0
-
-    for layer_thickness, ncells, spacing in zip(
-        layer_thicknesses, layer_n_cells, layer_spacing
-    ):
-        start_x = cumulative_thickness
-        stop_x = start_x + layer_thickness
-        cumulative_thickness = +stop_x
-        if spacing == "linear":
-            if layer_id == 0:
-                raise Exception("Linear spacing not set up for the first layer yet...")
-            x, _, _, actual_cells = linear_spacing(
-                start=start_x,
-                initial_dx=dx_last,
-                scale=spacing_scale_factor,
-                max_dist=cumulative_thickness,
-            )
-        else:  # spacing == 'constant':
-            x, dx_last, end = constant_spacing(
-                start=start_x, max_dist=stop_x, ncells=ncells
-            )
-
-        layer_id = layer_id + 1
-
-        if np.any(x):
-            total_x.append(x)
-
-    x = np.unique(np.concatenate(total_x)) * ureg("cm")
-    x = x.to("cm").m
+    layer_thicknesses = magnitude_as(layer_thicknesses, "cm")
+    x = _layer_nodes(
+        layer_thicknesses, layer_n_cells, layer_spacing, spacing_scale_factor
+    )
 
-    # right/left cell size - for making ghost layers
+    # left cell size - for making the y ghost layers
     ldx = x[1] - x[0]
-    rdx = x[-1] - x[-2]
 
     # Since this is a "1d" grid, it needs 3 cells in y
     # (1 on either side for ghost layers)
     y = np.array([-ldx, 0, ldx, ldx * 2], dtype=np.float64) - ldx / 2
 
     # add a ghost cell on either side
-    x = np.array([x[0] - ldx] + list(x) + [x[-1] + rdx], dtype=np.float64)
+    x = _add_ghost_nodes(x, 1)
     dx = np.diff(x) / 2.0
     xc = x[:-1] + dx / 2.0
 
-    layer_cell_idx_ranges = []  # [(first cell, last cell), etc]
+    # Label each cell with the layer it belongs to. The cell centers are sorted, so
+    # this is a single binary search against the layer interfaces. The ghost cells
+    # get the label of the adjacent (first or last) layer
     cum_layer_thickness = np.cumsum(layer_thicknesses)
-    for layer_idx, l_thick in enumerate(layer_thicknesses):
-        if layer_idx == 0:  # first layer
-            start_x = x[0]
-            end_x = cum_layer_thickness[layer_idx]
-        elif layer_idx == len(layer_thicknesses) - 1:  # last layer
-            start_x = cum_layer_thickness[layer_idx - 1]
-            end_x = x[-1]
-        else:  # middle layers
-            start_x = cum_layer_thickness[layer_idx - 1]
-            end_x = cum_layer_thickness[layer_idx]
-
-        loc = np.where((xc >= start_x) & (xc < end_x))[0]
-        start_i = loc[0]
-        end_i = loc[-1]
-        layer_cell_idx_ranges.append((start_i, end_i))
-
-    # 2d versions
-    y_2d, x_2d = np.meshgrid(y, x)  # nodes
+    layer_idx = np.searchsorted(cum_layer_thickness[:-1], xc, side="right")
+
+    # 2d versions of the nodes (read-only broadcast views of the 1d node locations)
+    node_shape = (x.shape[0], y.shape[0])
+    x_2d = np.broadcast_to(x[:, np.newaxis], node_shape)
+    y_2d = np.broadcast_to(y[np.newaxis, :], node_shape)
 
     # cell-centered arrays
-    rho = np.zeros((x.shape[0] - 1, 3))
-    u = np.zeros((x.shape[0] - 1, 3))
-    v = np.zeros((x.shape[0] - 1, 3))
-    p = np.zeros((x.shape[0] - 1, 3))
-
-    # Assign rho, u, v, and p to the cell-centered arrays
-    for layer_idx, layer in enumerate(layer_cell_idx_ranges):
-        if layer_idx == len(layer_cell_idx_ranges):
-            s = layer[0]
-            e = layer[1]
-        else:
-            s = layer[0]
-            e = -1
-
-        # Convert to cgs units
-        rho[s:e, :] = layer_density[layer_idx].to("g/cc").m
-        u[s:e, :] = layer_u[layer_idx].to("cm/s").m
-        v[s:e, :] = layer_v[layer_idx].to("cm/s").m
-        p[s:e, :] = layer_pressure[layer_idx].to("barye").m
-
-    # Assign ghost layer values
-    for i in [0, -1]:
-        rho[i, :] = layer_density[i].to("g/cc").m
-        u[i, :] = layer_u[i].to("cm/s").m
-        v[i, :] = layer_v[i].to("cm/s").m
-        p[i, :] = layer_pressure[i].to("barye").m
+    cell_shape = (x.shape[0] - 1, y.shape[0] - 1)
+    rho, u, v, p = _allocate_fields(cell_shape, fill_value=0.0)
+
+    # Assign rho, u, v, and p to the cell-centered arrays (converted to cgs units)
+    rho_layers = np.array([magnitude_as(d, "g/cc") for d in layer_density])
+    u_layers = np.array([magnitude_as(d, "cm/s") for d in layer_u])
+    v_layers = np.array([magnitude_as(d, "cm/s") for d in layer_v])
+    p_layers = np.array([magnitude_as(d, "barye") for d in layer_pressure])
+
+    rho[...] = rho_layers[layer_idx, np.newaxis]
+    u[...] = u_layers[layer_idx, np.newaxis]
+    v[...] = v_layers[layer_idx, np.newaxis]
+    p[...] = p_layers[layer_idx, np.newaxis]
 
     # cell spacing
-    dy = (np.diff(y_2d[0, :]) / 2.0)[0]
-    dx = (np.diff(x_2d[:, 0]) / 2.0)[0]
+    dy = (np.diff(y) / 2.0)[0]
+    dx = (np.diff(x) / 2.0)[0]
 
     # cell center locations
-    xc = x_2d[:-1, :-1] + dx
-    yc = y_2d[:-1, :-1] + dy
+    xc = np.broadcast_to((x[:-1] + dx)[:, np.newaxis], cell_shape)
+    yc = np.broadcast_to((y[:-1] + dy)[np.newaxis, :], cell_shape)
 
     return {
-        "x": x_2d * ureg("cm"),
-        "y": y_2d * ureg("cm"),
-        "rho": rho * ureg("g/cc"),
-        "u": u * ureg("cm/s"),
-        "v": v * ureg("cm/s"),
-        "p": p * ureg("barye"),
-        "xc": xc * ureg("cm"),
-        "yc": yc * ureg("cm"),
+        "x": ureg.Quantity(x_2d, "cm"),
+        "y": ureg.Quantity(y_2d, "cm"),
+        "rho": ureg.Quantity(rho, "g/cc"),
+        "u": ureg.Quantity(u, "cm/s"),
+        "v": ureg.Quantity(v, "cm/s"),
+        "p": ureg.Quantity(p, "barye"),
+        "xc": ureg.Quantity(xc, "cm"),
+        "yc": ureg.Quantity(yc, "cm"),
         "n_ghost_layers": n_ghost_layers,
     }
 
@@ -570,37 +489,85 @@ def make_1d_in_x_uniform_grid(n_cells, limits=(0, 1), input_file="input.ini"):
         np.arange(-1 * n_ghost_layers, n_ghost_layers + 2, dtype=np.float64) * dx
         - dx / 2.0
     )
-    xc = np.zeros(x.shape[0] - 1, dtype=np.float64)
-    yc = np.zeros(y.shape[0] - 1, dtype=np.float64)
-
-    # 2d versions
-    y_2d, x_2d = np.meshgrid(y, x)  # nodes
+    # 2d versions of the nodes. The grid is rectilinear, so these are read-only
+    # broadcast views of the 1d node locations rather than full meshgrid copies
+    node_shape = (x.shape[0], y.shape[0])
+    x_2d = np.broadcast_to(x[:, np.newaxis], node_shape)
+    y_2d = np.broadcast_to(y[np.newaxis, :], node_shape)
 
     # cell-centered arrays
-    cell_shape = (x_2d.shape[0] - 1, x_2d.shape[1] - 1)
-    rho = np.ones(cell_shape)
-    u = np.ones(cell_shape)
-    v = np.ones(cell_shape)
-    p = np.ones(cell_shape)
+    cell_shape = (x.shape[0] - 1, y.shape[0] - 1)
+    rho, u, v, p = _allocate_fields(cell_shape, fill_value=1.0)
 
     # cell center locations
-    xc = x_2d[:-1, :-1] + dx / 2.0
-    yc = y_2d[:-1, :-1] + dx / 2.0
+    xc = np.broadcast_to((x[:-1] + dx / 2.0)[:, np.newaxis], cell_shape)
+    yc = np.broadcast_to((y[:-1] + dx / 2.0)[np.newaxis, :], cell_shape)
 
     return {
-        "x": x_2d * ureg("cm"),
-        "y": y_2d * ureg("cm"),
-        "rho": rho * ureg("g/cc"),
-        "u": u * ureg("cm/s"),
-        "v": v * ureg("cm/s"),
-        "p": p * ureg("barye"),
-        "xc": xc * ureg("cm"),
-        "yc": yc * ureg("cm"),
+        "x": ureg.Quantity(x_2d, "cm"),
+        "y": ureg.Quantity(y_2d, "cm"),
+        "rho": ureg.Quantity(rho, "g/cc"),
+        "u": ureg.Quantity(u, "cm/s"),
+        "v": ureg.Quantity(v, "cm/s"),
+        "p": ureg.Quantity(p, "barye"),
+        "xc": ureg.Quantity(xc, "cm"),
+        "yc": ureg.Quantity(yc, "cm"),
         "n_ghost_layers": n_ghost_layers,
     }
 
 
-def write_initial_hdf5(filename, initial_condition_dict):
+def _pick_chunks(shape, itemsize, target_bytes=1 << 20):
+    """Chunk shape for an initial condition field. This is a single chunk if the
+    field fits in `target_bytes`, otherwise the field is tiled with chunks of
+    ~`target_bytes` that have the same aspect ratio as the field"""
+    n_target = max(1, target_bytes // itemsize)
+    n_total = np.prod(shape)
+    if n_total <= n_target:
+        return tuple(shape)
+
+    scale = (n_target / n_total) ** (1.0 / len(shape))
+    return tuple(max(1, min(n, int(n * scale))) for n in shape)
+
+
+def _write(h5, name, data, units, backend="gzip", single_chunk=False):
+    """Write a single field to an open hdf5 file with the requested compression"""
+    # The cell-centered fields are allocated in Fortran order, so the transposed
+    # view is already C-contiguous and no copy is made here. The 2d coordinates
+    # are broadcast views, and this is the only place they are materialized
+    data = np.ascontiguousarray(data.T, dtype=np.float64)
+
+    # Constant fields (e.g. zero velocity) don't need any storage at all. HDF5
+    # returns the fill value for every element of a dataset that was never written
+    if data.min() == data.max():
+        dset = h5.create_dataset(
+            name, shape=data.shape, dtype=data.dtype, fillvalue=data.flat[0]
+        )
+        dset.attrs["units"] = units
+        return
+
+    if single_chunk:
+        chunks = data.shape
+    else:
+        chunks = _pick_chunks(data.shape, data.dtype.itemsize)
+
+    if backend == "blosc":
+        import hdf5plugin
+
+        compression = hdf5plugin.Blosc(
+            cname="lz4", clevel=5, shuffle=hdf5plugin.Blosc.SHUFFLE
+        )
+    elif backend == "lzf":
+        compression = {"compression": "lzf", "shuffle": True}
+    elif backend == "gzip":
+        compression = {"compression": "gzip", "compression_opts": 4, "shuffle": True}
+    else:
+        raise Exception(f"Unknown compression backend: {backend}")
+
+    dset = h5.create_dataset(name, data=data, chunks=chunks, **compression)
+    dset.attrs["units"] = units
+
+
+def write_initial_hdf5(filename, initial_condition_dict, backend="gzip"):
     """ Write the initial conditions to an hdf5 file.
 
     Parameters
@@ -610,63 +577,54 @@ def write_initial_hdf5(filename, initial_condition_dict):
     initial_condition_dict : dictionary
         Dictionary created by the `make_uniform_grid` method. Must
         contain the following keys ['x', 'y', 'rho', 'u', 'v', 'p']
+    backend : str, optional
+        Compression filter, by default 'gzip'. Can be 'gzip', 'lzf' or
+        'blosc'. Only gzip is built into HDF5; for 'lzf' and 'blosc' cato must
+        be able to find the filter plugin (via HDF5_PLUGIN_PATH) to read the
+        file, and 'blosc' also requires the `hdf5plugin` package here
+
+    Notes
+    -----
+    cato reads each field in full on every image, so the chunks don't need to
+    line up with the domain decomposition; fewer, larger chunks are better.
+    Grids that are a single real cell wide in y (the 1D problems) are stored as
+    one chunk per field.
     """
 
     if not filename.endswith(".h5") or not filename.endswith(".hdf5"):
         filename += ".h5"
 
     print("Writing to: ", filename)
-    with h5py.File(filename, mode="w") as h5:
 
-        data = initial_condition_dict["n_ghost_layers"]
-        h5.create_dataset("/n_ghost_layers", data=data)
-
-        data = initial_condition_dict["x"].to("cm").m
-        dset = h5.create_dataset(
-            "/x", data=data.astype(np.float64).T, compression="gzip", compression_opts=9
-        )
-        dset.attrs["units"] = "cm"
-
-        data = initial_condition_dict["y"].to("cm").m
-        dset = h5.create_dataset(
-            "/y", data=data.astype(np.float64).T, compression="gzip", compression_opts=9
-        )
-        dset.attrs["units"] = "cm"
-
-        data = initial_condition_dict["rho"].to("g/cc").m
-        dset = h5.create_dataset(
-            "/density",
-            data=data.astype(np.float64).T,
-            compression="gzip",
-            compression_opts=9,
-        )
-        dset.attrs["units"] = "g/cc"
-
-        data = initial_condition_dict["u"].to("cm/s").m
-        dset = h5.create_dataset(
-            "/x_velocity",
-            data=data.astype(np.float64).T,
-            compression="gzip",
-            compression_opts=9,
-        )
-        dset.attrs["units"] = "cm/s"
-
-        data = initial_condition_dict["v"].to("cm/s").m
-        dset = h5.create_dataset(
-            "/y_velocity",
-            data=data.astype(np.float64).T,
-            compression="gzip",
-            compression_opts=9,
-        )
-        dset.attrs["units"] = "cm/s"
-
-        data = initial_condition_dict["p"].to("barye").m
-        dset = h5.create_dataset(
-            "/pressure",
-            data=data.astype(np.float64).T,
-            compression="gzip",
-            compression_opts=9,
+    # The initial conditions are written once, so use paged file space management
+    # (all of the metadata is aggregated and flushed in pages). Paging requires the
+    # v1.10 file format, so bound the format to v1.10 to keep the file readable by
+    # any HDF5 1.10+ build of cato
+    with h5py.File(
+        filename,
+        mode="w",
+        libver=("v110", "v110"),
+        fs_strategy="page",
+        fs_page_size=4096,
+    ) as h5:
+
+        n_ghost_layers = initial_condition_dict["n_ghost_layers"]
+        h5.create_dataset("/n_ghost_layers", data=n_ghost_layers)
+
+        # The 1D grids only have a single real cell in y. These are small enough that
+        # the overhead of multiple chunks dominates, so store them as a single chunk
+        single_chunk = (
+            min(initial_condition_dict["rho"].shape) <= 2 * n_ghost_layers + 1
         )
-        dset.attrs["units"] = "barye"
 
-        h5.close()
+        fields = [
+            ("/x", "x", "cm"),
+            ("/y", "y", "cm"),
+            ("/density", "rho", "g/cc"),
+            ("/x_velocity", "u", "cm/s"),
+            ("/y_velocity", "v", "cm/s"),
+            ("/pressure", "p", "barye"),
+        ]
+        for name, key, units in fields:
+            data = magnitude_as(initial_condition_dict[key], units)
+            _write(h5, name, data, units, backend, single_chunk)
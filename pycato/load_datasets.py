@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 """Read the .h5 files from a simulation into an xarray Dataset"""
 import configparser
+import json
 import os
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import h5py
 import numpy as np
@@ -13,8 +19,24 @@ from glob import glob
 from pathlib import Path
 from dask.diagnostics import ProgressBar
 
+try:
+    # Registers the Bitshuffle/LZ4 filter that the step files may be written with
+    # (io.use_bitshuffle in the input deck)
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
 
-from .unit_registry import ureg
+from .unit_registry import conversion_factor
+
+_step_number_regex = re.compile(r"\d+")
+
+_bitshuffle_filter_id = 32008
+
+# Raw chunk cache used when opening step files. cato caps each chunk at 1 MB (a
+# whole plane, or a strip of one for larger grids), so 4 MB holds several chunks,
+# and the slot count is a prime well above the number of chunks in a file so the
+# hash table doesn't collide
+_chunk_cache = {"rdcc_nbytes": 4 * 1024 ** 2, "rdcc_nslots": 12007}
 
 var_dict = {
     "density": {"long_name": "Density", "standard_name": "rho"},
@@ -83,6 +105,115 @@ def read_ini(filename):
     return flattened_dict
 
 
+def _git_dir(repo_dir):
+    """Locate the git directory of a checkout. In worktrees (and submodules) .git
+    is a file pointing at the actual git directory"""
+    git_path = os.path.join(repo_dir, ".git")
+    if os.path.isfile(git_path):
+        with open(git_path) as f:
+            contents = f.read().strip()
+        if contents.startswith("gitdir:"):
+            git_dir = contents[len("gitdir:") :].strip()
+            return os.path.normpath(os.path.join(repo_dir, git_dir))
+    return git_path
+
+
+def _git_output(args, repo_dir):
+    """Run a git command in the repository, returning None if it fails"""
+    try:
+        return (
+            subprocess.check_output(["git"] + args, cwd=repo_dir)
+            .decode("utf-8")
+            .strip()
+        )
+    except Exception:
+        return None
+
+
+def viewer_git_info(cache_file=".viewer_meta.json"):
+    """Get the short commit hash and branch of the cato checkout that pycato lives
+    in, for labeling result plots. The result is cached in `cache_file`, keyed on
+    the reflog of HEAD, which is touched whenever HEAD moves (commit, checkout,
+    reset, ...). Without a reflog git is called every time.
+
+    Parameters
+    ----------
+    cache_file : str
+        Path of the json cache file
+
+    Returns
+    -------
+    short_hash, branch : str
+        Each is "N/A" if it can't be determined
+    """
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    git_dir = _git_dir(repo_dir)
+    try:
+        key = [git_dir, os.stat(os.path.join(git_dir, "logs", "HEAD")).st_mtime_ns]
+    except OSError:
+        key = None
+
+    meta = None
+    if key is not None:
+        try:
+            with open(cache_file) as f:
+                meta = json.load(f)
+            if meta.get("key") != key:
+                meta = None
+        except (OSError, ValueError, AttributeError):
+            meta = None
+
+    if meta is None:
+        meta = {
+            "key": key,
+            "short_hash": _git_output(["rev-parse", "--short", "HEAD"], repo_dir),
+            "branch": _git_output(["rev-parse", "--abbrev-ref", "HEAD"], repo_dir),
+        }
+        if key is not None:
+            try:
+                with open(cache_file, "w") as f:
+                    json.dump(meta, f)
+            except OSError:
+                pass
+
+    short_hash = meta["short_hash"] or "N/A"
+    branch = meta["branch"]
+    if branch == "HEAD":
+        # Detached HEAD, e.g. in CI
+        branch = os.getenv("CI_COMMIT_REF_NAME")
+    if branch is None:
+        branch = "N/A"
+
+    return short_hash, branch
+
+
+def tail_walltime(filename="timing.csv", tail_bytes=8192):
+    """Get the final wall time from the solver's timing file. Only the end of the
+    file is read, since the last row is all that's needed.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the timing csv file
+    tail_bytes : int
+        Number of bytes at the end of the file to look at for the last row
+
+    Returns
+    -------
+    float
+    """
+    with open(filename, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - tail_bytes))
+        last_line = f.read().splitlines()[-1]
+
+    try:
+        return float(last_line.split(b",")[1])
+    except (IndexError, ValueError):
+        # Not a plain numeric row, so fall back to parsing the full file
+        return np.loadtxt(filename, delimiter=",", skiprows=1)[-1][1]
+
+
 def load_solution(folder):
     """Load a simulation case into a dataset"""
 
@@ -128,10 +259,11 @@ def load_source_file_to_dataset(ds):
     except ValueError:
         p_pulse = np.loadtxt(f, skiprows=1)
 
-    t = p_pulse[:, 0] * ureg("s")
-    power = p_pulse[:, 1] * ureg("erg/s")
+    # The source file is in [s] and [erg/s]
+    t = p_pulse[:, 0] * conversion_factor("s", "ns")
+    power = p_pulse[:, 1]
 
-    source_input = np.interp(fp=power.m, x=ds.time.data, xp=t.to("ns").m)
+    source_input = np.interp(fp=power, x=ds.time.data, xp=t)
 
     ds["power_input"] = xr.Variable(
         ("time"),
@@ -162,16 +294,13 @@ def load_bc_file_to_dataset(ds):
     except ValueError:
         bc = np.loadtxt(bc_file, skiprows=1)
 
-    bc_t = bc[:, 0] * ureg("s")
-    bc_p = bc[:, 1] * ureg("barye")
-    bc_rho = bc[:, 2] * ureg("g/cc")
+    # The boundary condition file is in [s], [barye], and [g/cc]
+    bc_t = bc[:, 0] * conversion_factor("s", "ns")
+    bc_p = bc[:, 1] * conversion_factor("barye", ds.pressure.units)
+    bc_rho = bc[:, 2] * conversion_factor("g/cc", ds.density.units)
 
-    bc_pressure = np.interp(
-        fp=bc_p.to(ds.pressure.units).m, x=ds.time.data, xp=bc_t.to("ns").m
-    )
-    bc_density = np.interp(
-        fp=bc_rho.to(ds.density.units).m, x=ds.time.data, xp=bc_t.to("ns").m
-    )
+    bc_pressure = np.interp(fp=bc_p, x=ds.time.data, xp=bc_t)
+    bc_density = np.interp(fp=bc_rho, x=ds.time.data, xp=bc_t)
 
     ds["boundary_pressure"] = xr.Variable(
         ("time"),
@@ -209,6 +338,19 @@ class _MultiFileCloser:
             f.close()
 
 
+def _check_filters(dset):
+    """Raise an exception if the dataset is compressed with a filter that
+    can't be decoded because the plugin for it isn't installed"""
+    plist = dset.id.get_create_plist()
+    filters = [plist.get_filter(i)[0] for i in range(plist.get_nfilters())]
+    if _bitshuffle_filter_id in filters and hdf5plugin is None:
+        raise Exception(
+            f"{dset.file.filename}:{dset.name} is compressed with the Bitshuffle "
+            "filter (io.use_bitshuffle = true in the input deck). Install the "
+            "hdf5plugin package to read it"
+        )
+
+
 def load_single(file, drop_ghost=True, use_dask=True, var_list="all", ini_file=None):
     """Load a single step file and generate an xarray Dataset
 
@@ -244,7 +386,7 @@ def load_single(file, drop_ghost=True, use_dask=True, var_list="all", ini_file=N
     if not file.endswith(".h5"):
         raise Exception("Step files must be .h5 files")
 
-    h5 = h5py.File(file, "r")
+    h5 = h5py.File(file, "r", **_chunk_cache)
 
     for v in var_list:
         try:
@@ -252,12 +394,18 @@ def load_single(file, drop_ghost=True, use_dask=True, var_list="all", ini_file=N
         except KeyError:
             continue
 
+        _check_filters(h5[f"/{v}"])
+
         if use_dask:
             chunk_size = h5[f"/{v}"].shape
             array = da.from_array(h5[f"/{v}"], chunks=chunk_size)
             array = da.transpose(array)
         else:
-            array = h5[f"/{v}"][()].T.astype(np.float32)
+            # Let HDF5 convert to float32 during the read, rather than reading
+            # the full 64-bit array and then making a 32-bit copy of it
+            array = np.empty(h5[f"/{v}"].shape, dtype=np.float32)
+            h5[f"/{v}"].read_direct(array)
+            array = array.T
 
         try:
             long_name = var_dict[v]["long_name"]
@@ -290,17 +438,22 @@ def load_single(file, drop_ghost=True, use_dask=True, var_list="all", ini_file=N
             },
         )
 
-    x = h5[f"/x"][()].T.astype(np.float32)
-    x_units = h5[f"/x"].attrs["units"].decode("utf-8")
-    y = h5[f"/y"][()].T.astype(np.float32)
-
-    # Get the cell centers
-    dy = (np.diff(x[0, :]) / 2.0)[0]
-    dx = (np.diff(y[:, 0]) / 2.0)[0]
+    # The grid is rectilinear, so only a single line of nodes in each direction
+    # is needed. Read these directly as hyperslabs rather than loading and
+    # transposing the full 2D coordinate arrays
+    x_dset = h5[f"/x"]
+    y_dset = h5[f"/y"]
+    _check_filters(x_dset)
+    _check_filters(y_dset)
+    x = np.empty(x_dset.shape[1], dtype=np.float32)
+    y = np.empty(y_dset.shape[0], dtype=np.float32)
+    x_dset.read_direct(x, np.s_[0, :])
+    y_dset.read_direct(y, np.s_[:, 0])
+    x_units = x_dset.attrs["units"].decode("utf-8")
 
     # cell center locations
-    xc = x[:-1, 0] + dx
-    yc = y[0, :-1] + dy
+    xc = x[:-1] + np.diff(x) / 2.0
+    yc = y[:-1] + np.diff(y) / 2.0
 
     coords = {
         "time": h5[f"/time"][()].astype(np.float32),
@@ -338,20 +491,25 @@ def load_single(file, drop_ghost=True, use_dask=True, var_list="all", ini_file=N
         attr_dict.update(input_dict)
 
     ds = xr.Dataset(data_vars=data_vars, coords=coords, attrs=attr_dict)
+
     if ini_file:
         try:
             ds.attrs["title"] = ds.attrs["general_title"]
         except Exception:
             pass
 
-    if drop_ghost:
-        try:
-            ds = ds.where(ds["ghost_cell"] == 0, drop=True)
-            return ds.drop("ghost_cell")
-        except KeyError:
-            return ds
+    if drop_ghost and "ghost_cell" in ds:
+        ds = _drop_ghost_cells(ds)
+
+    # The dask arrays read from the file lazily, so it has to stay open until the
+    # dataset is closed. Otherwise everything has already been read. This is set
+    # last, since some operations (e.g. drop_vars) don't carry the close hook over
+    if use_dask:
+        ds.set_close(h5.close)
     else:
-        return ds
+        h5.close()
+
+    return ds
 
 
 def load_multiple_steps(paths, use_dask=True, **kwargs):
@@ -369,27 +527,162 @@ def load_multiple_steps(paths, use_dask=True, **kwargs):
     xarray.Dataset
     """
 
-    if isinstance(paths, str):
-        paths = sorted(glob(paths))
-    else:
-        paths = [str(p) if isinstance(p, Path) else p for p in paths]
+    paths = find_step_files(paths)
 
     if use_dask:
-        # Use dask's delayed function on loading single step files
+        # Use dask's delayed function on loading single step files. These are
+        # mostly file opens and metadata reads, so use the threaded scheduler
         open_ = dask.delayed(load_single)
-        getattr_ = dask.delayed(getattr)
         datasets = [open_(f, **kwargs) for f in paths]
-
-        file_objs = [getattr_(ds, "_file_obj") for ds in datasets]
-        datasets, file_objs = dask.compute(datasets, file_objs)
+        datasets = list(dask.compute(*datasets, scheduler="threads"))
     else:
-        datasets = [load_single(f, use_dask=False, **kwargs) for f in paths]
+        # Each step file is independent, so load them concurrently. The hdf5 reads
+        # themselves are serialized by h5py, but opening the files and building
+        # each of the datasets overlaps
+        n_workers = min(32, (os.cpu_count() or 1) * 2)
+        load_ = partial(load_single, use_dask=False, **kwargs)
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            datasets = list(executor.map(load_, paths))
 
     # Concatenate all of the datasets together based on the time dimension
-    combined = xr.concat(datasets, dim="time")
+    combined = _tidy_time_series(xr.concat(datasets, dim="time"))
 
     if use_dask:
-        combined._file_obj = _MultiFileCloser(file_objs)
+        combined.set_close(_MultiFileCloser(datasets).close)
+
+    return combined
+
+
+def load_virtual_steps(paths, drop_ghost=True, var_list="all", ini_file=None):
+    """Load multiple datasets into a single time series via an HDF5 virtual dataset.
+    Each variable in all of the step files is mapped into one (time, ...) virtual
+    dataset, so the full time history of a variable is read with a single call
+    rather than opening and reading each step file in turn. All of the step files
+    must have the same grid.
+
+    Parameters
+    ----------
+    paths : str or List
+        Either a string glob in the form ``"path/to/my/files/*.h5"`` or an explicit list of
+        files to open. Paths can be given as strings or as pathlib Paths.
+    drop_ghost : bool, optional
+        Drop all of the ghost cells, by default True
+    var_list : List, optional
+        Load only a specific set of variables, by default 'all'
+
+    Returns
+    -------
+    xarray.Dataset
+    """
+
+    paths = [os.path.abspath(p) for p in find_step_files(paths)]
+
+    # The grid, variable attributes, and build info are the same for every step
+    first = load_single(
+        paths[0], drop_ghost=False, use_dask=False, var_list=var_list, ini_file=ini_file
+    )
+
+    # Build the virtual layout in a scratch file and then reopen it read-only.
+    # HDF5 opens the source files with the intent of the virtual dataset's file, so
+    # reading through a file opened for writing would try to take a write lock on
+    # every step file (and fail if any of them are already open)
+    data_vars = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vds_file = os.path.join(tmp_dir, "steps.h5")
+        variables = ["time"] + list(first.data_vars)
+        with h5py.File(paths[0], "r") as h5:
+            layouts = {
+                v: h5py.VirtualLayout(
+                    shape=(len(paths),) + h5[f"/{v}"].shape, dtype=h5[f"/{v}"].dtype
+                )
+                for v in variables
+            }
+
+        # A source that is missing is silently read as the fill value, so make sure
+        # every step actually has each variable (with the same shape) before
+        # mapping it into the layout
+        for t, f in enumerate(paths):
+            with h5py.File(f, "r") as h5:
+                for v in variables:
+                    shape = layouts[v].shape[1:]
+                    if v not in h5:
+                        raise Exception(f"Error: /{v} is missing from {f}")
+                    if h5[f"/{v}"].shape != shape:
+                        raise Exception(
+                            f"Error: /{v} in {f} has shape {h5[f'/{v}'].shape}, "
+                            f"expected {shape} (from {paths[0]})"
+                        )
+                    layouts[v][t] = h5py.VirtualSource(f, f"/{v}", shape=shape)
+
+        with h5py.File(vds_file, "w") as vds:
+            for v, layout in layouts.items():
+                vds.create_virtual_dataset(v, layout)
+
+        with h5py.File(vds_file, "r") as vds:
+            time = vds["time"][()].astype(np.float32)
+            for v in first.data_vars:
+                array = np.empty(vds[v].shape, dtype=np.float32)
+                vds[v].read_direct(array)
+                array = array.transpose(0, 2, 1)
+                data_vars[v] = xr.Variable(
+                    ("time",) + first[v].dims, array, attrs=first[v].attrs
+                )
+
+    coords = {"time": time, "x": first["x"], "y": first["y"]}
+    combined = xr.Dataset(data_vars=data_vars, coords=coords, attrs=first.attrs)
+
+    if drop_ghost and "ghost_cell" in combined:
+        combined = _drop_ghost_cells(combined)
+
+    return _tidy_time_series(combined)
+
+
+def _drop_ghost_cells(ds):
+    """Slice off the border of cells flagged by the ghost_cell variable. The ghost
+    cells are a fixed layer around the domain, so the real cells are a contiguous
+    block of i and j indices; slicing them out is a view, unlike a where/drop mask
+    that copies every variable"""
+    ghost_cell = ds["ghost_cell"]
+    if "time" in ghost_cell.dims:
+        ghost_cell = ghost_cell.isel(time=0)
+
+    real = (ghost_cell == 0).transpose("i", "j").values
+    i = np.flatnonzero(real.any(axis=1))
+    j = np.flatnonzero(real.any(axis=0))
+    ds = ds.isel(i=slice(i[0], i[-1] + 1), j=slice(j[0], j[-1] + 1))
+    return ds.drop_vars("ghost_cell")
+
+
+def _step_number(path):
+    """Sort key for step files, e.g. step_0000100.h5, that orders them by the
+    (last) number in the file name, so they sort correctly without zero padding"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    numbers = _step_number_regex.findall(name)
+    return (int(numbers[-1]) if numbers else -1, name)
+
+
+def find_step_files(paths):
+    """Expand a glob of step files into a list of file names, ordered by step
+    number (zero padding isn't assumed)
+
+    Parameters
+    ----------
+    paths : str or List
+        Either a string glob in the form ``"path/to/my/files/*.h5"`` or an explicit
+        list of files, which is returned in the order given
+
+    Returns
+    -------
+    List[str]
+    """
+    if isinstance(paths, str):
+        return sorted(glob(paths), key=_step_number)
+    else:
+        return [str(p) if isinstance(p, Path) else p for p in paths]
+
+
+def _tidy_time_series(combined):
+    """Remove duplicate times and squeeze out any dimensions of size 1"""
 
     # Get rid of duplicate times (if any)
     _, index = np.unique(combined["time"], return_index=True)
@@ -416,3 +709,42 @@ def serialize_compressed_dataset(dataset, filename="dataset.nc", lvl=6):
     encoding = {var: comp for var in dataset.data_vars}
     print(f"Saving dataset to: {os.path.abspath(filename)}")
     dataset.to_netcdf(filename, engine="h5netcdf", encoding=encoding)
+
+
+def serialize_zarr_dataset(dataset, store="results.zarr", clevel=3):
+    """Serialize a time series dataset to a Zarr store, one chunk per time level.
+    This needs the optional zarr/numcodecs packages; open the result with
+    ``xr.open_zarr(store)``.
+
+    Parameters
+    ----------
+    dataset : xr.Dataset
+    store : str
+        Path of the Zarr store (directory) to write
+    clevel : int
+        Level of compression to use
+    """
+    import zarr
+
+    # zarr 3 takes a list of codecs under "compressors", zarr 2 a single
+    # numcodecs compressor under "compressor"
+    if int(zarr.__version__.split(".")[0]) >= 3:
+        codec = zarr.codecs.BloscCodec(cname="lz4", clevel=clevel, shuffle="bitshuffle")
+        compression = {"compressors": [codec]}
+    else:
+        from numcodecs import Blosc
+
+        codec = Blosc(cname="lz4", clevel=clevel, shuffle=Blosc.BITSHUFFLE)
+        compression = {"compressor": codec}
+
+    encoding = {}
+    for var in dataset.data_vars:
+        shape = dataset[var].shape
+        if "time" in dataset[var].dims and len(shape) > 1:
+            chunks = (1,) + shape[1:]
+        else:
+            chunks = shape
+        encoding[var] = {"chunks": chunks, **compression}
+
+    print(f"Saving dataset to: {os.path.abspath(store)}")
+    dataset.to_zarr(store, mode="w", encoding=encoding)
@@ -1,4 +1,22 @@
 # -*- coding: utf-8 -*-
+from functools import lru_cache
+
 import pint
 
 ureg = pint.UnitRegistry()
+
+
+@lru_cache(maxsize=None)
+def conversion_factor(from_units, to_units):
+    """Multiplicative factor to convert from one set of units to another. This is
+    cached, so repeated conversions skip pint's unit parsing entirely. Only valid
+    for multiplicative units, i.e. not offset temperature units"""
+    return ureg.Quantity(1.0, from_units).to(to_units).magnitude
+
+
+def magnitude_as(quantity, units):
+    """Get the magnitude of a quantity in the given units. If the quantity is
+    already in these units, the magnitude is returned as-is (no conversion or copy)"""
+    if quantity.units == ureg.Unit(units):
+        return quantity.magnitude
+    return quantity.magnitude * conversion_factor(str(quantity.units), units)
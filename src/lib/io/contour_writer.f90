@@ -42,6 +42,12 @@ module mod_contour_writer
   private
   public :: contour_writer_t
 
+  integer, parameter :: max_chunk_bytes = 1024**2
+    !< Largest chunk size [bytes]. A field that fits is stored as one chunk covering
+    !< the whole plane, so a reader pulls it with a single chunk read/decompress.
+    !< Larger fields are split into strips of full columns (along the first, i.e.
+    !< contiguous, dimension) that stay under this size
+
   type :: contour_writer_t
     !< Type that manages writing out data to hdf5
     private
@@ -52,6 +58,7 @@ module mod_contour_writer
     character(len=:), allocatable :: xdmf_filename
     character(len=:), allocatable :: results_folder
     logical, private :: plot_64bit = .false.
+    logical, private :: use_bitshuffle = .false. !< Bitshuffle+LZ4 compression (if the filter plugin is found)
     logical, private :: plot_ghost_cells = .false.
     logical, private :: plot_reconstruction_states = .false.
     logical, private :: plot_reference_states = .false.
@@ -121,12 +128,14 @@ contains
     writer%plot_evolved_states = input%plot_evolved_states
     writer%plot_ghost_cells = input%plot_ghost_cells
     writer%plot_64bit = input%plot_64bit
+    writer%use_bitshuffle = input%use_bitshuffle
 
     if(this_image() == 1) then
       write(*, '(a)') "Contour Writer Info"
       write(*, '(a)') "==================="
       write(*, '(a, a)') 'Output folder: ', writer%results_folder
       write(*, '(a, l1)') 'plot_64bit: ', writer%plot_64bit
+      write(*, '(a, l1)') 'use_bitshuffle: ', writer%use_bitshuffle
       write(*, '(a, l1)') 'plot_ghost_cells: ', writer%plot_ghost_cells
       write(*, *)
     endif
@@ -209,7 +218,8 @@ contains
 
     if(this_image() == 1) then
       call self%hdf5_file%initialize(filename=self%results_folder//'/'//self%hdf5_filename, &
-                                     status='new', action='w', comp_lvl=self%compression_level)
+                                     status='new', action='w', comp_lvl=self%compression_level, &
+                                     bitshuffle=self%use_bitshuffle)
 
       ! Header info
       call self%hdf5_file%add('/title', master%title)
@@ -536,7 +546,7 @@ contains
     character(len=*), intent(in) :: description  !< dataset description
     character(len=*), intent(in) :: units        !< dataset units (if any)
 
-    call self%hdf5_file%add(name, data)
+    call self%hdf5_file%add(name, data, chunk_size=plane_chunk_size(shape(data), storage_size(data)))
     call self%hdf5_file%writeattr(name, 'description', trim(description))
     call self%hdf5_file%writeattr(name, 'units', trim(units))
   endsubroutine write_2d_integer_data
@@ -558,7 +568,7 @@ contains
     jhi = ubound(data, dim=2)
 
     if(self%plot_64bit) then
-      call self%hdf5_file%add(name, data)
+      call self%hdf5_file%add(name, data, chunk_size=plane_chunk_size(shape(data), storage_size(data)))
     else
 
       allocate(single_prec_data(ilo:ihi, jlo:jhi))
@@ -577,7 +587,8 @@ contains
         enddo
       enddo
 
-      call self%hdf5_file%add(name, single_prec_data)
+      call self%hdf5_file%add(name, single_prec_data, &
+                              chunk_size=plane_chunk_size(shape(data), storage_size(single_prec_data)))
 
       deallocate(single_prec_data)
     endif
@@ -585,4 +596,16 @@ contains
     call self%hdf5_file%writeattr(name, 'description', trim(description))
     call self%hdf5_file%writeattr(name, 'units', trim(units))
   endsubroutine write_2d_real_data
+
+  pure function plane_chunk_size(data_shape, element_bits) result(chunk_size)
+    !< Chunk dimensions covering the full 2D field, capped at max_chunk_bytes
+    integer(ik), dimension(2), intent(in) :: data_shape
+    integer, intent(in) :: element_bits !< storage size of each element [bits]
+    integer, dimension(2) :: chunk_size
+    integer :: max_elements
+
+    max_elements = max_chunk_bytes / (element_bits / 8)
+    chunk_size(1) = int(min(data_shape(1), max_elements))
+    chunk_size(2) = int(min(data_shape(2), max(1, max_elements / chunk_size(1))))
+  endfunction plane_chunk_size
 endmodule mod_contour_writer
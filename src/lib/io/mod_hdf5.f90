@@ -52,6 +52,7 @@ module hdf5_interface
                       sid, did, pid
     integer :: comp_lvl = 0 !! compression level (1-9)  0: disable compression
     integer(HSIZE_T) :: chunk_size(6) = [64, 64, 1, 1, 1, 1]  !! chunk size per dimension
+    logical :: bitshuffle = .false. !! use Bitshuffle+LZ4 (filter 32008) instead of shuffle+deflate, if available
     logical :: verbose = .false.
 
   contains
@@ -91,7 +92,7 @@ module hdf5_interface
 
 contains
   !=============================================================================
-  subroutine hdf_initialize(self, filename, status, action, comp_lvl)
+  subroutine hdf_initialize(self, filename, status, action, comp_lvl, bitshuffle)
     !! Opens hdf5 file
 
     class(hdf5_file), intent(inout) :: self
@@ -99,6 +100,7 @@ contains
     character(*), intent(in), optional :: status
     character(*), intent(in), optional :: action
     integer, intent(in), optional :: comp_lvl
+    logical, intent(in), optional :: bitshuffle
 
     character(:), allocatable :: lstatus, laction
     integer :: ierr
@@ -106,6 +108,7 @@ contains
     self%filename = filename
 
     if(present(comp_lvl)) self%comp_lvl = comp_lvl
+    if(present(bitshuffle)) self%bitshuffle = bitshuffle
 
     !! Initialize FORTRAN interface.
     call h5open_f(ierr)
@@ -242,6 +245,11 @@ contains
 
     integer :: ierr, ndims, i
     integer(HSIZE_T), allocatable :: chunk_size(:)
+    logical :: bitshuffle_avail
+
+    integer, parameter :: H5Z_FILTER_BITSHUFFLE = 32008
+    !! Bitshuffle options: block size (0 -> automatic) and compression (2 -> LZ4)
+    integer, parameter :: bitshuffle_opts(2) = [0, 2]
 
     ndims = size(dims)
     allocate(chunk_size(ndims))
@@ -266,6 +274,21 @@ contains
 
     if(self%comp_lvl < 1 .or. self%comp_lvl > 9) return
 
+    if(self%bitshuffle) then
+      ! The filter is a dynamically loaded plugin (HDF5_PLUGIN_PATH), so fall
+      ! back to shuffle+deflate if it can't be found
+      call h5zfilter_avail_f(H5Z_FILTER_BITSHUFFLE, bitshuffle_avail, ierr)
+      if(ierr == 0 .and. bitshuffle_avail) then
+        call h5pset_filter_f(self%pid, H5Z_FILTER_BITSHUFFLE, H5Z_FLAG_OPTIONAL_F, &
+                             size(bitshuffle_opts, kind=SIZE_T), bitshuffle_opts, ierr)
+        if(ierr /= 0) then
+          print *, 'error enabling Bitshuffle compression '//self%filename
+          error stop
+        endif
+        return
+      endif
+    endif
+
     call h5pset_shuffle_f(self%pid, ierr)
     if(ierr /= 0) then
       print *, 'error enabling Shuffle '//self%filename
@@ -105,6 +105,7 @@ module mod_input
     logical :: plot_reference_states = .false.
     logical :: plot_evolved_states = .false.
     logical :: plot_64bit = .true.
+    logical :: use_bitshuffle = .false. ! compress contour output with Bitshuffle+LZ4 (needs the HDF5 filter plugin to read)
     logical :: plot_ghost_cells = .true.
     logical :: plot_coarray_ids = .true. ! write out the coarray image index for each cell
     logical :: plot_volume = .true.
@@ -441,6 +442,7 @@ contains
     ! call cfg%get("io", "plot_evolved_states", self%plot_evolved_states, .false.)
     ! call cfg%get("io", "plot_ghost_cells", self%plot_ghost_cells, .true.)
     call cfg%get("io", "plot_64bit", self%plot_64bit, .true.)
+    call cfg%get("io", "use_bitshuffle", self%use_bitshuffle, .false.)
 
   endsubroutine read_from_ini
 
@@ -540,6 +542,7 @@ contains
       write(*, '(a, l1)') "plot_reference_states = ", self%plot_reference_states
       write(*, '(a, l1)') "plot_evolved_states = ", self%plot_evolved_states
       write(*, '(a, l1)') "plot_64bit = ", self%plot_64bit
+      write(*, '(a, l1)') "use_bitshuffle = ", self%use_bitshuffle
       write(*, '(a, l1)') "plot_ghost_cells = ", self%plot_ghost_cells
 
       write(*, '(a)') "==============="
@@ -30,11 +30,19 @@ domain["y"] = domain["y"]
 x = domain["xc"]
 y = domain["yc"]
 
-# Make pressure a centered gaussian with surrounding pressure of 1.0
+# Make pressure a centered gaussian with surrounding pressure of 1.0. This is
+# evaluated in place in a single buffer (plus the one temporary for y**2 / fwhm)
+# with the same operation order as p_max * exp(-(x**2/fwhm + y**2/fwhm)) + p0
 fwhm = 0.001
 p_max = 10.0
-p = p_max * np.exp(-((x.m ** 2) / fwhm + (y.m ** 2) / fwhm)) + p0
-domain["p"] = p * ureg(str(domain["p"].units))
+p = np.square(x.m)
+p /= fwhm
+p += np.square(y.m) / fwhm
+np.negative(p, out=p)
+np.exp(p, out=p)
+p *= p_max
+p += p0
+domain["p"] = ureg.Quantity(p, domain["p"].units)
 
 # Zero velocity everywhere
 domain["u"] = domain["u"] * 0.0
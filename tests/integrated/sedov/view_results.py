@@ -3,55 +3,32 @@
 A simple script to view the results from the simulation
 """
 
-import h5py
-import numpy as np
-import os
 import pytz
 from datetime import datetime
 import matplotlib.pyplot as plt
-import os, sys
-import subprocess
+import sys
 import pandas as pd
 
 sys.path.append("../../..")
-from pycato import *
+from pycato import find_step_files, load_single, tail_walltime, viewer_git_info
+
+# Split long paths (the contour lines on a fine grid) into chunks when rendering
+plt.rcParams["agg.path.chunksize"] = 10000
 
 tz = pytz.timezone("America/New_York")
 now = datetime.now(tz)
 
-try:
-    short_hash = (
-        subprocess.check_output(["git", "rev-parse", "--short", "HEAD"])
-        .decode("utf-8")
-        .strip()
-    )
-except Exception:
-    short_hash = "N/A"
-
-try:
-    branch = (
-        subprocess.check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"])
-        .decode("utf-8")
-        .strip()
-    )
-
-    if branch == "HEAD":
-        branch = os.getenv("CI_COMMIT_REF_NAME")
-    if branch is None:
-        branch = "N/A"
-
-except Exception:
-    branch = "N/A"
+short_hash, branch = viewer_git_info()
 
 try:
-    walltime_sec = np.loadtxt("timing.csv", delimiter=",", skiprows=1)[-1][1]
+    walltime_sec = tail_walltime("timing.csv")
 except Exception:
     walltime_sec = "N/A"
 
-# Load cato results
-from dask.diagnostics import ProgressBar
-
-ds = load_solution(".")
+# Load cato results. Only the final step is plotted, so just read that file rather
+# than the full time series
+last_step = find_step_files("results/step*.h5")[-1]
+ds = load_single(last_step, use_dask=False, ini_file="input.ini")
 
 try:
     scheme = f"{ds.attrs['scheme_flux_solver']}({ds.attrs['scheme_spatial_reconstruction']} {ds.attrs['scheme_limiter']})"
@@ -61,21 +38,36 @@ except Exception:
 df = pd.read_csv("residual_hist.csv", index_col=False)
 
 fig, (contour_ax, resid_ax) = plt.subplots(ncols=2, nrows=1, figsize=(24, 12))
-ds.density[-1].plot.pcolormesh(
-    x="x",
-    y="y",
-    ec="k",
-    lw=0.1,
-    antialiased=True,
+# Pull the density out once and hand the same array to both plots
+x = ds.x.values
+y = ds.y.values
+rho = ds.density.transpose("j", "i").values
+
+mesh = contour_ax.pcolormesh(
+    x,
+    y,
+    rho,
+    shading="nearest",
+    antialiased=False,
+    rasterized=True,
     cmap="viridis",
     vmin=0.0,
     vmax=2.4e-3,
-    ax=contour_ax,
 )
-
-ds.density[-1].plot.contour(
-    x="x", y="y", colors="k", linewidths=0.5, antialiased=True, levels=12, ax=contour_ax
+fig.colorbar(mesh, ax=contour_ax, label=f"Density [{ds.density.units}]")
+
+contour_ax.contour(
+    x,
+    y,
+    rho,
+    colors="k",
+    linewidths=0.5,
+    antialiased=True,
+    levels=12,
+    rasterized=True,
 )
+contour_ax.set_xlabel("x")
+contour_ax.set_ylabel("y")
 
 # Plot the residual history
 df.plot(
@@ -91,7 +83,7 @@ resid_ax.set_ylabel("residual")
 resid_ax.set_xlabel("time")
 resid_ax.set_ylim(1e-6, 1e1)
 
-t = ds.time[-1].data
+t = ds.time.data
 contour_ax.set_title(
     f"Sedov Test @ {now} \nsimulation t={t:.4f} s \nwalltime={walltime_sec} s\nbranch: {branch} \ncommit: {short_hash} \nscheme: {scheme}"
 )
@@ -101,4 +93,4 @@ r = 0.2
 contour_ax.set_xlim(-r, r)
 contour_ax.set_ylim(-r, r)
 plt.tight_layout()
-plt.savefig("sedov_2d_results.png")
+plt.savefig("sedov_2d_results.png", dpi=150)
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from functools import lru_cache
+
 import numpy as np
 import scipy
 import scipy.optimize
@@ -35,9 +37,11 @@ def shock_tube_function(p4, p1, p5, rho1, rho5, gamma, dustFrac=0.0):
     return p1 * fact - p4
 
 
+@lru_cache(maxsize=32)
 def calculate_regions(pl, ul, rhol, pr, ur, rhor, gamma=1.4, dustFrac=0.0):
     """
-    Compute regions
+    Compute regions. The states don't depend on time, so the result (a tuple of
+    floats) is cached and only solved for once per set of initial states
     :rtype : tuple
     :return: returns p, rho and u for regions 1,3,4,5 as well as the shock speed
     """
@@ -3,64 +3,43 @@
 A simple script to view the results from the simulation
 """
 
-import h5py
-import numpy as np
-import os
 import pytz
 from datetime import datetime
 import matplotlib.pyplot as plt
-import os, sys
+import sys
 import sod
-import subprocess
 
 sys.path.append("../../..")
-from pycato import *
+from pycato import load_virtual_steps, tail_walltime, viewer_git_info
 
 tz = pytz.timezone("America/New_York")
 now = datetime.now(tz)
 
-try:
-    short_hash = (
-        subprocess.check_output(["git", "rev-parse", "--short", "HEAD"])
-        .decode("utf-8")
-        .strip()
-    )
-except Exception:
-    short_hash = "N/A"
-
-try:
-    branch = (
-        subprocess.check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"])
-        .decode("utf-8")
-        .strip()
-    )
-
-    if branch == "HEAD":
-        branch = os.getenv("CI_COMMIT_REF_NAME")
-    if branch is None:
-        branch = "N/A"
-
-except Exception:
-    branch = "N/A"
+short_hash, branch = viewer_git_info()
 
 try:
-    walltime_sec = np.loadtxt("timing.csv", delimiter=",", skiprows=1)[-1][1]
+    walltime_sec = tail_walltime("timing.csv")
 except Exception:
     walltime_sec = "N/A"
 
-# Load cato results
-from dask.diagnostics import ProgressBar
-
-with ProgressBar():
-    ds = load_multiple_steps("results/step*.h5", ini_file="input.ini")
+# Load cato results. The step files are mapped into a single virtual dataset so
+# each variable's time history is read in one go
+ds = load_virtual_steps(
+    "results/step*.h5",
+    var_list=["density", "x_velocity", "pressure"],
+    ini_file="input.ini",
+)
 
 # try:
 scheme = f"{ds.attrs['scheme_flux_solver']}({ds.attrs['scheme_spatial_reconstruction']} {ds.attrs['scheme_limiter']})"
 # except Exception:
 #     scheme = None
 
+# Select the time level to plot once, and read all of the plotted variables at it
 t = 0.2
-actual_time = ds.density.sel(time=t, method="nearest").time.data
+snap = ds.sel(time=t, method="nearest")[["density", "x_velocity", "pressure"]]
+snap = snap.compute()
+actual_time = snap.time.data
 
 gamma = 1.4
 npts = 500
@@ -79,15 +58,20 @@ rho = values["rho"]
 u = values["u"]
 
 
+# There's no point drawing more points than the figure has pixels, so average the
+# solution down to ~1000 points before plotting
+k = max(1, snap.sizes["i"] // 1000)
+snap = snap.coarsen(i=k, boundary="trim").mean()
+
 plt.figure(figsize=(12, 6))
 
-ds.density.sel(time=t, method="nearest").plot(x="x", label="CATO Density")
+snap.density.plot(x="x", label="CATO Density")
 plt.plot(values["x"], rho, label="Exact Density")
 
-ds.x_velocity.sel(time=t, method="nearest").plot(x="x", label="CATO Velocity")
+snap.x_velocity.plot(x="x", label="CATO Velocity")
 plt.plot(values["x"], u, label="Exact Velocity")
 
-ds.pressure.sel(time=t, method="nearest").plot(x="x", label="CATO Pressure")
+snap.pressure.plot(x="x", label="CATO Pressure")
 plt.plot(values["x"], p, label="Exact Pressure")
 
 plt.title(
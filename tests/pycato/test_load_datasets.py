@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""Tests for reading simulation step files with pycato"""
+
+import os
+import sys
+
+import h5py
+import numpy as np
+import pytest
+import xarray as xr
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from pycato import (
+    find_step_files,
+    load_multiple_steps,
+    load_single,
+    load_virtual_steps,
+    serialize_zarr_dataset,
+    viewer_git_info,
+)
+from pycato import load_datasets
+from pycato.load_datasets import _git_dir
+
+
+def _write_step(filename, time, nx=6, ny=4, n_ghost_layers=0):
+    """Write a small step file laid out the way cato writes them"""
+    x, y = np.meshgrid(np.linspace(0.0, 1.0, nx + 1), np.linspace(0.0, 0.5, ny + 1))
+    with h5py.File(filename, "w") as h5:
+        h5["/x"] = x
+        h5["/x"].attrs["units"] = np.bytes_("cm")
+        h5["/y"] = y
+        h5["/y"].attrs["units"] = np.bytes_("cm")
+        h5["/time"] = np.float64(time)
+        h5["/time"].attrs["units"] = np.bytes_("ns")
+        for v in ["density", "pressure", "x_velocity", "y_velocity"]:
+            h5[f"/{v}"] = np.random.rand(ny, nx) + time
+            h5[f"/{v}"].attrs["units"] = np.bytes_("g/cc")
+        if n_ghost_layers:
+            n = n_ghost_layers
+            ghost_cell = np.ones((ny, nx), dtype=np.int32)
+            ghost_cell[n:-n, n:-n] = 0
+            h5["/ghost_cell"] = ghost_cell
+
+
+@pytest.fixture
+def step_files(tmp_path):
+    files = []
+    for step in range(4):
+        filename = str(tmp_path / f"step_{step:07d}.h5")
+        _write_step(filename, time=0.1 * step)
+        files.append(filename)
+    return files
+
+
+def test_load_virtual_steps_matches_load_multiple_steps(step_files):
+    expected = load_multiple_steps(step_files, use_dask=False)
+    xr.testing.assert_identical(load_virtual_steps(step_files), expected)
+
+
+def test_load_virtual_steps_with_open_step_files(step_files):
+    expected = load_multiple_steps(step_files, use_dask=False)
+
+    # A plain read-only handle, and the handle that the (lazy) dask path of
+    # load_single keeps open until the dataset is closed
+    with h5py.File(step_files[0], "r"):
+        lazy = load_single(step_files[1])
+        try:
+            xr.testing.assert_identical(load_virtual_steps(step_files), expected)
+        finally:
+            lazy.close()
+
+
+def test_viewer_git_info_cache(tmp_path, monkeypatch):
+    # Run from somewhere other than the case directories
+    monkeypatch.chdir(tmp_path)
+    info = viewer_git_info()
+    assert all(isinstance(v, str) for v in info)
+
+    # The second call is served from the cache (if the checkout has a reflog)
+    repo_dir = os.path.join(os.path.dirname(__file__), "../..")
+    if os.path.exists(os.path.join(_git_dir(repo_dir), "logs", "HEAD")):
+        assert (tmp_path / ".viewer_meta.json").exists()
+    assert viewer_git_info() == info
+
+
+def test_git_dir_of_worktree(tmp_path):
+    (tmp_path / ".git").write_text("gitdir: ../main/.git/worktrees/wt\n")
+    expected = os.path.normpath(str(tmp_path / "../main/.git/worktrees/wt"))
+    assert _git_dir(str(tmp_path)) == expected
+
+
+def test_bitshuffle_without_hdf5plugin(step_files, monkeypatch):
+    # Tag the density as Bitshuffle compressed. With allow_unknown_filter the filter
+    # is optional, so the data itself is still written raw
+    with h5py.File(step_files[0], "a") as h5:
+        density = h5["/density"][()]
+        del h5["/density"]
+        h5.create_dataset(
+            "/density",
+            data=density,
+            chunks=density.shape,
+            compression=32008,
+            compression_opts=(0, 2),
+            allow_unknown_filter=True,
+        )
+
+    monkeypatch.setattr(load_datasets, "hdf5plugin", None)
+    with pytest.raises(Exception, match="hdf5plugin"):
+        load_single(step_files[0])
+
+
+def test_find_step_files_orders_by_step_number(tmp_path):
+    for step in [10, 9, 100]:
+        _write_step(str(tmp_path / f"step_{step}.h5"), time=float(step))
+
+    files = find_step_files(str(tmp_path / "step*.h5"))
+    assert [os.path.basename(f) for f in files] == [
+        "step_9.h5",
+        "step_10.h5",
+        "step_100.h5",
+    ]
+
+
+@pytest.mark.parametrize("step, var", [(-1, "pressure"), (1, "time")])
+def test_load_virtual_steps_missing_variable(step_files, step, var):
+    with h5py.File(step_files[step], "a") as h5:
+        del h5[f"/{var}"]
+
+    with pytest.raises(Exception, match=f"/{var} is missing"):
+        load_virtual_steps(step_files)
+
+
+def test_load_virtual_steps_mismatched_shape(step_files):
+    _write_step(step_files[2], time=0.2, nx=8)
+    with pytest.raises(Exception, match="expected"):
+        load_virtual_steps(step_files)
+
+
+def _is_closed(filename):
+    """HDF5 won't reopen a file for writing while this process holds it read-only"""
+    try:
+        with h5py.File(filename, "a"):
+            return True
+    except OSError:
+        return False
+
+
+def test_load_multiple_steps_close(step_files):
+    ds = load_multiple_steps(step_files)
+    assert not any(_is_closed(f) for f in step_files)
+    ds.close()
+    assert all(_is_closed(f) for f in step_files)
+
+
+@pytest.fixture
+def ghost_step_files(tmp_path):
+    files = []
+    for step in range(3):
+        filename = str(tmp_path / f"step_{step:07d}.h5")
+        _write_step(filename, time=0.1 * step, nx=10, ny=8, n_ghost_layers=2)
+        files.append(filename)
+    return files
+
+
+@pytest.mark.parametrize("use_dask", [False, True])
+def test_load_single_drops_ghost_cells(ghost_step_files, use_dask):
+    filename = ghost_step_files[0]
+    raw = load_single(filename, drop_ghost=False, use_dask=use_dask)
+    real = raw.ghost_cell.compute() == 0
+    expected = raw.where(real, drop=True).drop_vars("ghost_cell")
+
+    ds = load_single(filename, use_dask=use_dask)
+    assert ds.sizes == {"i": 6, "j": 4}
+    xr.testing.assert_identical(ds, expected)
+
+    raw.close()
+    ds.close()
+    assert _is_closed(filename)
+
+
+def test_load_virtual_steps_drops_ghost_cells(ghost_step_files):
+    expected = load_multiple_steps(ghost_step_files, use_dask=False)
+    assert "ghost_cell" not in expected
+    xr.testing.assert_identical(load_virtual_steps(ghost_step_files), expected)
+
+
+def test_load_multiple_steps_close_with_ghost_cells(ghost_step_files):
+    ds = load_multiple_steps(ghost_step_files)
+    assert "ghost_cell" not in ds
+    ds.close()
+    assert all(_is_closed(f) for f in ghost_step_files)
+
+
+@pytest.mark.parametrize("use_dask", [False, True])
+def test_load_single_cell_centers(tmp_path, use_dask):
+    filename = str(tmp_path / "step_0000000.h5")
+    _write_step(filename, time=0.0)
+
+    # Stretch the grid so the centers aren't uniformly spaced
+    with h5py.File(filename, "a") as h5:
+        h5["/x"][...] = h5["/x"][()] ** 2
+        h5["/y"][...] = np.sqrt(h5["/y"][()])
+        x = h5["/x"][0, :]
+        y = h5["/y"][:, 0]
+
+    ds = load_single(filename, use_dask=use_dask)
+    np.testing.assert_allclose(ds.x, (x[:-1] + x[1:]) / 2.0, rtol=1e-6)
+    np.testing.assert_allclose(ds.y, (y[:-1] + y[1:]) / 2.0, rtol=1e-6)
+    ds.close()
+
+
+def test_serialize_zarr_dataset(step_files, tmp_path):
+    pytest.importorskip("zarr")
+    ds = load_multiple_steps(step_files, use_dask=False)
+    store = str(tmp_path / "results.zarr")
+    serialize_zarr_dataset(ds, store=store)
+
+    with xr.open_zarr(store) as stored:
+        xr.testing.assert_identical(stored.load(), ds)